@@ -0,0 +1,67 @@
+# cython: language_level=3
+"""
+==============================================================================
+CYTHON STENCIL KERNEL
+==============================================================================
+
+Typed-memoryview counterpart of the Numba solve_year kernel in explicite.py.
+Bounds checking and negative-index wrapping are compiled out, so the loops
+translate to plain C while staying a regular Python-callable function.
+Works on float64 and float32 state through a fused type.
+
+Build in place with:
+    python setup.py build_ext --inplace
+"""
+
+cimport cython
+
+ctypedef fused real:
+    float
+    double
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def solve_year(real[:, ::1] u_prev, real[:, ::1] u_curr,
+               const real[::1] surface, const real[::1] r):
+    """
+    Advances temperature profiles through one year of explicit time steps,
+    ping-ponging between two buffers.
+
+    Parameters:
+    -----------
+    u_prev  : Profiles at the start of the year, overwritten with the
+              profiles at the end of the year (array (n, lanes))
+    u_curr  : Scratch buffer of the same shape and dtype (array)
+    surface : Surface temperature for every time step (array of Nt_pts)
+    r       : Stability factor K * dt / dz^2 per lane (array)
+    """
+    cdef Py_ssize_t n = u_prev.shape[0]
+    cdef Py_ssize_t lanes = u_prev.shape[1]
+    cdef Py_ssize_t nt = surface.shape[0] - 1
+    cdef Py_ssize_t t, i, l
+    cdef real[:, ::1] a = u_prev
+    cdef real[:, ::1] b = u_curr
+    cdef real[:, ::1] tmp
+
+    if u_curr.shape[0] != n or u_curr.shape[1] != lanes or r.shape[0] != lanes or n < 3:
+        raise ValueError("u_prev and u_curr must share a (n >= 3, lanes) shape "
+                         "and r must hold one value per lane")
+
+    with nogil:
+        for t in range(1, nt + 1):
+            for i in range(1, n - 1):
+                for l in range(lanes):
+                    b[i, l] = a[i, l] + r[l] * (a[i-1, l] - 2 * a[i, l] + a[i+1, l])
+            # Neumann Condition at the bottom, Dirichlet Condition at the surface
+            for l in range(lanes):
+                b[n-1, l] = b[n-2, l]
+                b[0, l] = surface[t]
+            tmp = a
+            a = b
+            b = tmp
+
+    # After an odd number of steps the result lives in the scratch buffer
+    if nt % 2 == 1:
+        u_prev[:, :] = a
@@ -0,0 +1,37 @@
+"""
+Builds the optional compiled stencil kernels used by explicite.py:
+the C extension (BACKEND = "c") and, when Cython is installed, the
+Cython module (BACKEND = "cython").
+
+    python setup.py build_ext --inplace
+"""
+
+from setuptools import setup, Extension
+
+NATIVE_FLAGS = ["-O3", "-march=native", "-ffast-math", "-funroll-loops"]
+
+ext_modules = [
+    Extension(
+        "solver",
+        sources=["solver.c"],
+        depends=["solver_kernels.h"],
+        extra_compile_args=NATIVE_FLAGS,
+    ),
+]
+
+# Cython is only needed for the optional heat.pyx kernel
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+if cythonize is not None:
+    ext_modules += cythonize(
+        [Extension("heat", sources=["heat.pyx"], extra_compile_args=NATIVE_FLAGS)],
+        compiler_directives={"boundscheck": False, "wraparound": False, "cdivision": True},
+    )
+
+setup(
+    name="explicite-solver",
+    ext_modules=ext_modules,
+)
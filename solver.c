@@ -0,0 +1,201 @@
+/*
+ * ==============================================================================
+ * C STENCIL KERNEL
+ * ==============================================================================
+ *
+ * Native counterpart of the Numba solve_year kernel in explicite.py.
+ * The whole year of time steps runs in C, so Python is entered once per
+ * simulated year. Buffers are read through the buffer protocol and must be
+ * C-contiguous arrays laid out as (depth, lanes), all float64 or all float32.
+ * The kernels themselves live in solver_kernels.h, instantiated once per type.
+ *
+ * When compiled with AVX2 and FMA (-march=native on a recent x86 CPU) the
+ * stencil uses explicit intrinsics, otherwise a portable loop is used.
+ *
+ * Build in place with:
+ *     python setup.py build_ext --inplace
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#if defined(__AVX2__) && defined(__FMA__)
+#include <immintrin.h>
+#define HAVE_AVX2 1
+#endif
+
+/* float64 kernels: 4 doubles per AVX2 register */
+#define REAL double
+#define SUFFIX _f64
+#ifdef HAVE_AVX2
+#define VEC __m256d
+#define VLEN 4
+#define VLOADU _mm256_loadu_pd
+#define VSTOREU _mm256_storeu_pd
+#define VLOADA _mm256_load_pd
+#define VSTOREA _mm256_store_pd
+#define VADD _mm256_add_pd
+#define VSUB _mm256_sub_pd
+#define VFMADD _mm256_fmadd_pd
+#endif
+#include "solver_kernels.h"
+#undef REAL
+#undef SUFFIX
+#undef VEC
+#undef VLEN
+#undef VLOADU
+#undef VSTOREU
+#undef VLOADA
+#undef VSTOREA
+#undef VADD
+#undef VSUB
+#undef VFMADD
+
+/* float32 kernels: 8 floats per AVX2 register */
+#define REAL float
+#define SUFFIX _f32
+#ifdef HAVE_AVX2
+#define VEC __m256
+#define VLEN 8
+#define VLOADU _mm256_loadu_ps
+#define VSTOREU _mm256_storeu_ps
+#define VLOADA _mm256_load_ps
+#define VSTOREA _mm256_store_ps
+#define VADD _mm256_add_ps
+#define VSUB _mm256_sub_ps
+#define VFMADD _mm256_fmadd_ps
+#endif
+#include "solver_kernels.h"
+#undef REAL
+#undef SUFFIX
+#undef VEC
+#undef VLEN
+#undef VLOADU
+#undef VSTOREU
+#undef VLOADA
+#undef VSTOREA
+#undef VADD
+#undef VSUB
+#undef VFMADD
+
+/* Fetches a C-contiguous float64 or float32 buffer of the requested dimension */
+static int
+get_buffer(PyObject *obj, Py_buffer *view, int ndim, int writable, const char *name)
+{
+    int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+    if (writable) {
+        flags |= PyBUF_WRITABLE;
+    }
+    if (PyObject_GetBuffer(obj, view, flags) < 0) {
+        return -1;
+    }
+    if (view->ndim != ndim
+        || (strcmp(view->format, "d") != 0 && strcmp(view->format, "f") != 0)) {
+        PyErr_Format(PyExc_TypeError, "%s must be a %d-D float64 or float32 array", name, ndim);
+        PyBuffer_Release(view);
+        return -1;
+    }
+    return 0;
+}
+
+PyDoc_STRVAR(solve_year_doc,
+"solve_year(u_prev, u_curr, surface, r)\n"
+"\n"
+"Advances temperature profiles through one year of explicit time steps,\n"
+"ping-ponging between two buffers. All arrays share one dtype, either\n"
+"float64 or float32.\n"
+"\n"
+"Parameters:\n"
+"-----------\n"
+"u_prev  : Profiles at the start of the year, overwritten with the\n"
+"          profiles at the end of the year (array (n, lanes))\n"
+"u_curr  : Scratch buffer of the same shape (array)\n"
+"surface : Surface temperature for every time step (array of Nt + 1)\n"
+"r       : Stability factor K * dt / dz^2 per lane (array)\n");
+
+static PyObject *
+solve_year(PyObject *self, PyObject *args)
+{
+    PyObject *o_prev, *o_curr, *o_surface, *o_r;
+    Py_buffer prev, curr, surf, rv;
+
+    if (!PyArg_ParseTuple(args, "OOOO", &o_prev, &o_curr, &o_surface, &o_r)) {
+        return NULL;
+    }
+    if (get_buffer(o_prev, &prev, 2, 1, "u_prev") < 0) {
+        return NULL;
+    }
+    if (get_buffer(o_curr, &curr, 2, 1, "u_curr") < 0) {
+        goto fail_prev;
+    }
+    if (get_buffer(o_surface, &surf, 1, 0, "surface") < 0) {
+        goto fail_curr;
+    }
+    if (get_buffer(o_r, &rv, 1, 0, "r") < 0) {
+        goto fail_surf;
+    }
+
+    Py_ssize_t n = prev.shape[0];
+    Py_ssize_t lanes = prev.shape[1];
+    Py_ssize_t nt = surf.shape[0] - 1;
+    if (curr.shape[0] != n || curr.shape[1] != lanes || rv.shape[0] != lanes || n < 3) {
+        PyErr_SetString(PyExc_ValueError,
+                        "u_prev and u_curr must share a (n >= 3, lanes) shape "
+                        "and r must hold one value per lane");
+        goto fail_r;
+    }
+    const char *fmt = prev.format;
+    if (strcmp(curr.format, fmt) != 0 || strcmp(surf.format, fmt) != 0
+        || strcmp(rv.format, fmt) != 0) {
+        PyErr_SetString(PyExc_TypeError, "u_prev, u_curr, surface and r must share one dtype");
+        goto fail_r;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    if (fmt[0] == 'd') {
+        run_year_f64((double *)prev.buf, (double *)curr.buf,
+                     (const double *)surf.buf, (const double *)rv.buf, n, lanes, nt);
+    }
+    else {
+        run_year_f32((float *)prev.buf, (float *)curr.buf,
+                     (const float *)surf.buf, (const float *)rv.buf, n, lanes, nt);
+    }
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&rv);
+    PyBuffer_Release(&surf);
+    PyBuffer_Release(&curr);
+    PyBuffer_Release(&prev);
+    Py_RETURN_NONE;
+
+fail_r:
+    PyBuffer_Release(&rv);
+fail_surf:
+    PyBuffer_Release(&surf);
+fail_curr:
+    PyBuffer_Release(&curr);
+fail_prev:
+    PyBuffer_Release(&prev);
+    return NULL;
+}
+
+static PyMethodDef solver_methods[] = {
+    {"solve_year", solve_year, METH_VARARGS, solve_year_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef solver_module = {
+    PyModuleDef_HEAD_INIT,
+    "solver",
+    "C stencil kernel for the explicit heat equation scheme.",
+    -1,
+    solver_methods
+};
+
+PyMODINIT_FUNC
+PyInit_solver(void)
+{
+    return PyModule_Create(&solver_module);
+}
@@ -0,0 +1,195 @@
+/*
+ * ==============================================================================
+ * C STENCIL KERNEL (TYPE-GENERIC PART)
+ * ==============================================================================
+ *
+ * Included by solver.c once per floating point type. The includer defines:
+ *
+ *     REAL    : Element type (double or float)
+ *     SUFFIX  : Suffix appended to every function name (e.g. _f64)
+ *
+ * and, when AVX2 and FMA are available:
+ *
+ *     VEC     : AVX2 register type holding VLEN elements
+ *     VLEN    : Elements per register (4 doubles or 8 floats)
+ *     VLOADU, VSTOREU, VADD, VSUB, VFMADD : Matching intrinsics
+ *     VLOADA, VSTOREA : Aligned load / store (32-byte boundary)
+ */
+
+#define KCAT_(a, b) a##b
+#define KCAT(a, b) KCAT_(a, b)
+#define FN(name) KCAT(name, SUFFIX)
+
+/*
+ * Interior update, portable version. Lanes are the contiguous inner loop,
+ * which GCC vectorizes on its own when it can prove the trip count.
+ */
+static void
+FN(interior_scalar)(REAL *restrict u_new, const REAL *restrict u_old,
+                    const REAL *restrict r, Py_ssize_t n, Py_ssize_t lanes)
+{
+    for (Py_ssize_t i = 1; i < n - 1; i++) {
+        const REAL *restrict c = u_old + i * lanes;
+        REAL *restrict out = u_new + i * lanes;
+#pragma GCC ivdep
+        for (Py_ssize_t l = 0; l < lanes; l++) {
+            out[l] = c[l] + r[l] * (c[l - lanes] - (REAL)2 * c[l] + c[l + lanes]);
+        }
+    }
+}
+
+#ifdef VEC
+/*
+ * Interior update for a lane count that is a multiple of VLEN: one AVX2
+ * register holds VLEN lanes of a single depth. Walking down the depth axis,
+ * the centre and lower neighbours are carried over in registers, so each
+ * output vector costs a single new load. A row then spans whole registers,
+ * so 32-byte aligned buffers keep every access aligned; `aligned` is a
+ * literal at each call site and the branch folds away once inlined.
+ */
+static inline void
+FN(rows_body)(REAL *restrict u_new, const REAL *restrict u_old,
+              const REAL *restrict r, Py_ssize_t n, Py_ssize_t lanes, const int aligned)
+{
+    for (Py_ssize_t k = 0; k < lanes; k += VLEN) {
+        const VEC vr = VLOADU(r + k);
+        VEC up = aligned ? VLOADA(u_old + k) : VLOADU(u_old + k);
+        VEC c = aligned ? VLOADA(u_old + lanes + k) : VLOADU(u_old + lanes + k);
+        for (Py_ssize_t i = 1; i < n - 1; i++) {
+            const REAL *p = u_old + (i + 1) * lanes + k;
+            REAL *o = u_new + i * lanes + k;
+            VEC down = aligned ? VLOADA(p) : VLOADU(p);
+            VEC d = VSUB(VADD(up, down), VADD(c, c));
+            VEC out = VFMADD(vr, d, c);
+            if (aligned) {
+                VSTOREA(o, out);
+            }
+            else {
+                VSTOREU(o, out);
+            }
+            up = c;
+            c = down;
+        }
+    }
+}
+
+static void
+FN(interior_avx2_rows)(REAL *restrict u_new, const REAL *restrict u_old,
+                       const REAL *restrict r, Py_ssize_t n, Py_ssize_t lanes)
+{
+    if ((((uintptr_t)u_new | (uintptr_t)u_old) & 31) == 0) {
+        FN(rows_body)(u_new, u_old, r, n, lanes, 1);
+    }
+    else {
+        FN(rows_body)(u_new, u_old, r, n, lanes, 0);
+    }
+}
+
+/*
+ * Interior update for a lane count dividing VLEN: vectors run along the
+ * flattened (depth, lane) axis, a register spans several depths and the
+ * per-lane factors repeat inside it. The up/down neighbours sit lanes
+ * elements away, less than a register, so they are always loaded
+ * unaligned. When both buffers share their alignment, a scalar head walks
+ * up to the first 32-byte boundary so the centre load and the store are
+ * aligned; the per-lane pattern is rotated to start at that point. The
+ * tail is done scalarly.
+ */
+static void
+FN(interior_avx2_flat)(REAL *restrict u_new, const REAL *restrict u_old,
+                       const REAL *restrict r, Py_ssize_t n, Py_ssize_t lanes)
+{
+    Py_ssize_t j = lanes;
+    Py_ssize_t end = (n - 1) * lanes;
+    const int aligned = ((((uintptr_t)u_new ^ (uintptr_t)u_old) & 31) == 0);
+    if (aligned) {
+        for (; j < end && ((uintptr_t)(u_new + j) & 31) != 0; j++) {
+            u_new[j] = u_old[j] + r[j % lanes] * (u_old[j - lanes] - (REAL)2 * u_old[j] + u_old[j + lanes]);
+        }
+    }
+    REAL rt[VLEN];
+    for (int q = 0; q < VLEN; q++) {
+        rt[q] = r[(j + q) % lanes];
+    }
+    const VEC vr = VLOADU(rt);
+    if (aligned) {
+        for (; j + VLEN <= end; j += VLEN) {
+            VEC c = VLOADA(u_old + j);
+            VEC up = VLOADU(u_old + j - lanes);
+            VEC down = VLOADU(u_old + j + lanes);
+            VEC d = VSUB(VADD(up, down), VADD(c, c));
+            VSTOREA(u_new + j, VFMADD(vr, d, c));
+        }
+    }
+    else {
+        for (; j + VLEN <= end; j += VLEN) {
+            VEC c = VLOADU(u_old + j);
+            VEC up = VLOADU(u_old + j - lanes);
+            VEC down = VLOADU(u_old + j + lanes);
+            VEC d = VSUB(VADD(up, down), VADD(c, c));
+            VSTOREU(u_new + j, VFMADD(vr, d, c));
+        }
+    }
+    for (; j < end; j++) {
+        u_new[j] = u_old[j] + r[j % lanes] * (u_old[j - lanes] - (REAL)2 * u_old[j] + u_old[j + lanes]);
+    }
+}
+#endif
+
+/*
+ * One explicit time step, boundaries included.
+ *
+ * u_new   : Profiles at time step t (n * lanes values, overwritten)
+ * u_old   : Profiles at time step t-1 (n * lanes values, read only)
+ * r       : Stability factor per lane (lanes values)
+ * surface : Surface temperature at time step t
+ */
+static void
+FN(step)(REAL *restrict u_new, const REAL *restrict u_old,
+         const REAL *restrict r, Py_ssize_t n, Py_ssize_t lanes, REAL surface)
+{
+#ifdef VEC
+    if (lanes % VLEN == 0) {
+        FN(interior_avx2_rows)(u_new, u_old, r, n, lanes);
+    }
+    else if (VLEN % lanes == 0) {
+        FN(interior_avx2_flat)(u_new, u_old, r, n, lanes);
+    }
+    else {
+        FN(interior_scalar)(u_new, u_old, r, n, lanes);
+    }
+#else
+    FN(interior_scalar)(u_new, u_old, r, n, lanes);
+#endif
+    /* Neumann Condition at the bottom, Dirichlet Condition at the surface */
+    memcpy(u_new + (n - 1) * lanes, u_new + (n - 2) * lanes, lanes * sizeof(REAL));
+    for (Py_ssize_t l = 0; l < lanes; l++) {
+        u_new[l] = surface;
+    }
+}
+
+/*
+ * One year of time steps, ping-ponging between u_prev and u_curr.
+ * The result is always left in u_prev.
+ */
+static void
+FN(run_year)(REAL *u_prev, REAL *u_curr, const REAL *surface, const REAL *r,
+             Py_ssize_t n, Py_ssize_t lanes, Py_ssize_t nt)
+{
+    REAL *a = u_prev;
+    REAL *b = u_curr;
+    for (Py_ssize_t t = 1; t <= nt; t++) {
+        FN(step)(b, a, r, n, lanes, surface[t]);
+        REAL *tmp = a;
+        a = b;
+        b = tmp;
+    }
+    /* After an odd number of steps the result lives in the scratch buffer */
+    if (a != u_prev) {
+        memcpy(u_prev, a, n * lanes * sizeof(REAL));
+    }
+}
+
+#undef FN
+#undef KCAT
+#undef KCAT_